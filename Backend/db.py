@@ -14,3 +14,12 @@ users_collection = db["users"]
 
 
 lessons_collection = db["lessons"]  # Ready for use
+
+# Precomputed tutor/lesson/category/daily rollups (see routes/analytics.py)
+analytics_collection = db["analytics"]
+
+def ensure_indexes():
+    # Called on app startup so importing this module stays free of network calls
+    analytics_collection.create_index([("tutor_id", 1), ("scope", 1), ("key", 1)], unique=True)
+    lessons_collection.create_index("tutor_id")
+    lessons_collection.create_index("tutorId")
@@ -1,10 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+from pymongo.errors import PyMongoError
 import os
-from routes import lessons, quiz, text_lessons, auth, lesson_management  # Add lesson_management
+from routes import lessons, quiz, text_lessons, auth, lesson_management, analytics
+from db import ensure_indexes
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Index creation needs Mongo; log and carry on so the app still starts without it
+    try:
+        ensure_indexes()
+    except PyMongoError as e:
+        print(f"Error creating indexes: {str(e)}")
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,6 +31,7 @@ app.include_router(lessons.router, prefix="/api")  # Your existing video upload
 app.include_router(lesson_management.router, prefix="/api")  # Add this new line
 app.include_router(quiz.router, prefix="/api")     
 app.include_router(text_lessons.router, prefix="/api")  
+app.include_router(analytics.router, prefix="/api")
 
 os.makedirs("uploaded_videos", exist_ok=True)
 os.makedirs("uploaded_quiz", exist_ok=True)
@@ -0,0 +1,368 @@
+from fastapi import APIRouter, HTTPException, Query, Depends
+from bson import ObjectId
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta, timezone
+from pymongo import UpdateOne, ReturnDocument
+from db import lessons_collection, analytics_collection
+from routes.auth import get_current_user_payload, role_required
+
+router = APIRouter()
+
+# Rollup documents live in the "analytics" collection, one per (tutor, scope, key):
+#   scope "tutor"          -> key is the tutor_id (overall totals)
+#   scope "lesson"         -> key is the lesson id
+#   scope "category"       -> key is the category name
+#   scope "daily"          -> key is the UTC day, "YYYY-MM-DD"
+#   scope "lesson_daily"   -> key is "YYYY-MM-DD:<lesson id>"
+#   scope "category_daily" -> key is "YYYY-MM-DD:<category>"
+# Each holds views, completions, rating_sum and rating_count counters (plus
+# lesson_count for the totals), so the dashboard is a single indexed read.
+#
+# Events and new lessons $inc the rollups in one unordered bulk upsert. A tutor
+# is seeded from the lessons collection the first time they are touched, and
+# POST /analytics/rebuild/{tutor_id} reconciles the totals from it on demand.
+TOTAL_SCOPES = ["tutor", "lesson", "category"]
+DAILY_SCOPES = ["daily", "lesson_daily", "category_daily"]
+DAILY_WINDOW_DAYS = 30
+MAX_DAILY_WINDOW_DAYS = 366
+MAX_EVENTS_PER_BATCH = 100
+
+# Lessons only carry an averaged "rating"; it counts as a single sample
+LESSON_RATING_SUM = {"$cond": [{"$gt": [{"$ifNull": ["$rating", 0]}, 0]}, "$rating", 0]}
+LESSON_RATING_COUNT = {"$cond": [{"$gt": [{"$ifNull": ["$rating", 0]}, 0]}, 1, 0]}
+
+class LessonEvent(BaseModel):
+    lesson_id: str
+    type: Literal["view", "completion"]
+
+class EventBatch(BaseModel):
+    events: List[LessonEvent] = Field(..., min_length=1, max_length=MAX_EVENTS_PER_BATCH)
+
+def rollup_id(tutor_id, scope, key):
+    return f"{scope}:{tutor_id}:{key}"
+
+def rollup_id_expr(tutor_id):
+    """Aggregation equivalent of rollup_id for documents carrying scope and key"""
+    return {"$concat": ["$scope", ":", {"$literal": tutor_id}, ":", "$key"]}
+
+def check_own_analytics(tutor_id, payload):
+    if payload.get("sub") != tutor_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view another tutor's analytics.")
+
+def lesson_tutor(lesson):
+    return lesson.get("tutor_id") or lesson.get("tutorId")
+
+def utc_day(now=None):
+    return (now or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime("%Y-%m-%d")
+
+def daily_window(from_day=None, to_day=None, today=None):
+    """Resolve the requested daily window, defaulting to the last DAILY_WINDOW_DAYS days"""
+    to_day = to_day or today or datetime.now(timezone.utc).date()
+    from_day = from_day or to_day - timedelta(days=DAILY_WINDOW_DAYS - 1)
+    if from_day > to_day:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (to_day - from_day).days >= MAX_DAILY_WINDOW_DAYS:
+        raise HTTPException(status_code=400, detail=f"Window is limited to {MAX_DAILY_WINDOW_DAYS} days")
+    return from_day, to_day
+
+def find_lessons(lesson_ids):
+    """Fetch lessons for a batch of ids, whether stored as ObjectId or uuid string"""
+    candidates = list(lesson_ids)
+    candidates += [ObjectId(lesson_id) for lesson_id in lesson_ids if ObjectId.is_valid(lesson_id)]
+    lessons = lessons_collection.find(
+        {"_id": {"$in": candidates}},
+        {"tutor_id": 1, "tutorId": 1, "category": 1},
+    )
+    return {str(lesson["_id"]): lesson for lesson in lessons}
+
+def event_increments(event):
+    if event.type == "view":
+        return {"views": 1}
+    return {"completions": 1}
+
+def merge_increments(target, increments):
+    for field, amount in increments.items():
+        target[field] = target.get(field, 0) + amount
+
+def event_rollups(tutor_id, lesson_id, category, day):
+    """The (scope, key, extra fields) of every rollup an event lands in"""
+    return [
+        ("tutor", tutor_id, {}),
+        ("lesson", lesson_id, {}),
+        ("category", category, {}),
+        ("daily", day, {"day": day}),
+        ("lesson_daily", f"{day}:{lesson_id}", {"day": day, "lesson_id": lesson_id}),
+        ("category_daily", f"{day}:{category}", {"day": day, "category": category}),
+    ]
+
+def collapse_events(events, lessons, day):
+    """Fold a batch of events into one increment per lesson and per rollup"""
+    lesson_increments = {}
+    rollups = {}
+    for event in events:
+        lesson = lessons.get(event.lesson_id)
+        if not lesson:
+            raise HTTPException(status_code=404, detail=f"Lesson not found: {event.lesson_id}")
+        tutor_id = lesson_tutor(lesson)
+        if not tutor_id:
+            raise HTTPException(status_code=400, detail=f"Lesson has no tutor: {event.lesson_id}")
+
+        increments = event_increments(event)
+        merge_increments(lesson_increments.setdefault(event.lesson_id, {}), increments)
+
+        category = lesson.get("category", "Uncategorized")
+        for scope, key, extra in event_rollups(tutor_id, event.lesson_id, category, day):
+            rollup = rollups.setdefault(
+                rollup_id(tutor_id, scope, key),
+                {"tutor_id": tutor_id, "scope": scope, "key": key, **extra, "inc": {}},
+            )
+            merge_increments(rollup["inc"], increments)
+    return lesson_increments, rollups
+
+def lesson_update(increments):
+    return {"$inc": increments}
+
+def rollup_update(rollup, now):
+    return {
+        "$inc": rollup["inc"],
+        "$set": {"updated_at": now},
+        "$setOnInsert": {field: value for field, value in rollup.items() if field != "inc"},
+    }
+
+def format_rollup(doc):
+    views = doc.get("views", 0)
+    completions = doc.get("completions", 0)
+    rating_count = doc.get("rating_count", 0)
+    rollup = {
+        "key": doc["key"],
+        "views": views,
+        "completions": completions,
+        "completion_rate": round(completions / views, 4) if views else 0,
+        "rating_count": rating_count,
+        "average_rating": round(doc.get("rating_sum", 0) / rating_count, 2) if rating_count else 0,
+        "updated_at": doc.get("updated_at"),
+    }
+    for field in ("lesson_count", "day", "lesson_id", "category"):
+        if field in doc:
+            rollup[field] = doc[field]
+    return rollup
+
+def rebuild_pipeline(tutor_id, version, now):
+    """Aggregation recomputing a tutor's tutor/lesson/category rollups into "analytics"
+
+    A rollup is only replaced by a run with a version at least as new, so
+    overlapping rebuilds can't roll the totals back. A tutor with no lessons
+    still gets an all-zero "tutor" rollup.
+    """
+    sums = {
+        "lesson_count": {"$sum": 1},
+        "views": {"$sum": "$views"},
+        "completions": {"$sum": "$completions"},
+        "rating_sum": {"$sum": "$rating_sum"},
+        "rating_count": {"$sum": "$rating_count"},
+    }
+    empty_tutor = {
+        "scope": "tutor",
+        "key": tutor_id,
+        "lesson_count": 0,
+        "views": 0,
+        "completions": 0,
+        "rating_sum": 0,
+        "rating_count": 0,
+    }
+
+    def grouped(scope, key_expr):
+        return [
+            {"$group": {"_id": key_expr, **sums}},
+            {"$set": {"scope": scope, "key": {"$toString": "$_id"}}},
+        ]
+
+    return [
+        {"$match": {"$or": [{"tutor_id": tutor_id}, {"tutorId": tutor_id}]}},
+        {"$project": {
+            "lesson_id": {"$toString": "$_id"},
+            "category": {"$ifNull": ["$category", "Uncategorized"]},
+            "views": {"$ifNull": ["$views", 0]},
+            "completions": {"$ifNull": ["$completions", 0]},
+            "rating_sum": {"$ifNull": ["$rating_sum", LESSON_RATING_SUM]},
+            "rating_count": {"$ifNull": ["$rating_count", LESSON_RATING_COUNT]},
+        }},
+        {"$facet": {
+            "lesson": grouped("lesson", "$lesson_id"),
+            "category": grouped("category", "$category"),
+            "tutor": grouped("tutor", {"$literal": tutor_id}),
+        }},
+        {"$project": {"rollups": {"$concatArrays": [
+            "$lesson",
+            "$category",
+            {"$cond": [{"$eq": [{"$size": "$tutor"}, 0]}, [{"$literal": empty_tutor}], "$tutor"]},
+        ]}}},
+        {"$unwind": "$rollups"},
+        {"$replaceRoot": {"newRoot": "$rollups"}},
+        {"$set": {
+            "_id": rollup_id_expr(tutor_id),
+            "tutor_id": {"$literal": tutor_id},
+            "version": version,
+            "updated_at": {"$literal": now},
+        }},
+        {"$merge": {
+            "into": "analytics",
+            "on": "_id",
+            "whenMatched": [{"$replaceWith": {
+                "$cond": [{"$gte": ["$$new.version", {"$ifNull": ["$version", 0]}]}, "$$new", "$$ROOT"]
+            }}],
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+def rebuild_rollups(tutor_id):
+    """Recompute a tutor's tutor/lesson/category rollups from the lessons collection
+
+    Increments landing while a rebuild runs may be lost from the totals; running
+    the rebuild again reconciles them. Daily buckets are left untouched.
+    """
+    version = analytics_collection.find_one_and_update(
+        {"_id": rollup_id(tutor_id, "version", tutor_id)},
+        {"$inc": {"seq": 1}, "$setOnInsert": {"tutor_id": tutor_id, "scope": "version", "key": tutor_id}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )["seq"]
+    lessons_collection.aggregate(rebuild_pipeline(tutor_id, version, datetime.utcnow().isoformat()))
+
+    # Drop rollups this run no longer produced (deleted lessons, old categories)
+    analytics_collection.delete_many({
+        "tutor_id": tutor_id,
+        "scope": {"$in": TOTAL_SCOPES},
+        "version": {"$not": {"$gte": version}},
+    })
+
+def seed_missing_tutors(tutor_ids):
+    """Rebuild the totals of tutors that have never been rolled up; returns those seeded"""
+    seeded_ids = {rollup_id(tutor_id, "tutor", tutor_id) for tutor_id in tutor_ids}
+    existing = {doc["tutor_id"] for doc in analytics_collection.find({"_id": {"$in": list(seeded_ids)}}, {"tutor_id": 1})}
+    missing = set(tutor_ids) - existing
+    for tutor_id in missing:
+        rebuild_rollups(tutor_id)
+    return missing
+
+def record_lesson_created(lesson):
+    """Count a newly inserted lesson in its tutor's rollups"""
+    tutor_id = lesson_tutor(lesson)
+    if not tutor_id:
+        return
+    try:
+        # Seeding reads the lessons collection, so it has already counted this one
+        if seed_missing_tutors({tutor_id}):
+            return
+        now = datetime.utcnow().isoformat()
+        rollups = [
+            ("tutor", tutor_id),
+            ("lesson", str(lesson["_id"])),
+            ("category", lesson.get("category", "Uncategorized")),
+        ]
+        analytics_collection.bulk_write([
+            UpdateOne(
+                {"_id": rollup_id(tutor_id, scope, key)},
+                rollup_update({"tutor_id": tutor_id, "scope": scope, "key": key, "inc": {"lesson_count": 1}}, now),
+                upsert=True,
+            )
+            for scope, key in rollups
+        ], ordered=False)
+    except Exception as e:
+        # The lesson itself is saved; POST /analytics/rebuild/{tutor_id} recovers the rollups
+        print(f"Error updating analytics for new lesson: {str(e)}")
+
+# Record a batch of view/completion events
+@router.post("/analytics/events")
+async def record_events(batch: EventBatch, payload: dict = Depends(get_current_user_payload)):
+    try:
+        lessons = find_lessons({event.lesson_id for event in batch.events})
+        # Events are bucketed by server time so clients can't backdate them
+        lesson_increments, rollups = collapse_events(batch.events, lessons, utc_day())
+
+        lessons_collection.bulk_write([
+            UpdateOne({"_id": lessons[lesson_id]["_id"]}, lesson_update(increments))
+            for lesson_id, increments in lesson_increments.items()
+        ], ordered=False)
+
+        # First contact with a tutor seeds their totals from the lessons, which
+        # already include this batch; only their daily buckets still need it.
+        seeded = seed_missing_tutors({rollup["tutor_id"] for rollup in rollups.values()})
+
+        now = datetime.utcnow().isoformat()
+        operations = [
+            UpdateOne({"_id": _id}, rollup_update(rollup, now), upsert=True)
+            for _id, rollup in rollups.items()
+            if not (rollup["tutor_id"] in seeded and rollup["scope"] in TOTAL_SCOPES)
+        ]
+        if operations:
+            analytics_collection.bulk_write(operations, ordered=False)
+
+        return {
+            "message": "Events recorded",
+            "event_count": len(batch.events),
+            "rollups_updated": len(operations),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Rebuild a tutor's tutor/lesson/category rollups from the lessons collection
+@router.post("/analytics/rebuild/{tutor_id}")
+async def rebuild_tutor_analytics(tutor_id: str, payload: dict = Depends(role_required(["tutor"]))):
+    check_own_analytics(tutor_id, payload)
+    try:
+        rebuild_rollups(tutor_id)
+        return {"message": "Analytics rebuilt", "tutor_id": tutor_id}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Get a tutor's totals and daily buckets for a window in one indexed read
+@router.get("/analytics/tutor/{tutor_id}")
+async def get_tutor_analytics(
+    tutor_id: str,
+    from_day: Optional[date] = Query(None, alias="from"),
+    to_day: Optional[date] = Query(None, alias="to"),
+    payload: dict = Depends(role_required(["tutor"])),
+):
+    check_own_analytics(tutor_id, payload)
+    from_day, to_day = daily_window(from_day, to_day)
+
+    try:
+        query = {
+            "tutor_id": tutor_id,
+            "$or": [
+                {"scope": {"$in": TOTAL_SCOPES}},
+                {
+                    "scope": {"$in": DAILY_SCOPES},
+                    "key": {"$gte": from_day.isoformat(), "$lt": (to_day + timedelta(days=1)).isoformat()},
+                },
+            ],
+        }
+        docs = list(analytics_collection.find(query).sort([("scope", 1), ("key", 1)]))
+
+        # Tutors who have never been rolled up are seeded from their lessons once
+        if not any(doc["scope"] == "tutor" for doc in docs):
+            rebuild_rollups(tutor_id)
+            docs = list(analytics_collection.find(query).sort([("scope", 1), ("key", 1)]))
+
+        result = {scope: [] for scope in TOTAL_SCOPES + DAILY_SCOPES}
+        for doc in docs:
+            result[doc["scope"]].append(format_rollup(doc))
+
+        totals = result["tutor"]
+        return {
+            "tutor_id": tutor_id,
+            "from": from_day.isoformat(),
+            "to": to_day.isoformat(),
+            "totals": totals[0] if totals else format_rollup({"key": tutor_id}),
+            "lessons": result["lesson"],
+            "categories": result["category"],
+            "daily": result["daily"],
+            "lesson_daily": result["lesson_daily"],
+            "category_daily": result["category_daily"],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from typing import Optional
 import datetime
 from db import lessons_collection
+from routes.analytics import record_lesson_created
 
 router = APIRouter()
 
@@ -87,6 +88,8 @@ async def add_test_data():
         ]
         
         result = lessons_collection.insert_many(test_lessons)
+        for lesson in test_lessons:
+            record_lesson_created(lesson)
         return {
             "message": "Test data added successfully",
             "inserted_count": len(result.inserted_ids),
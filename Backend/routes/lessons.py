@@ -5,6 +5,7 @@ from datetime import datetime
 import os
 import shutil
 from db import lessons_collection
+from routes.analytics import record_lesson_created
 from fastapi import Query
 
 router = APIRouter()
@@ -80,5 +81,6 @@ async def upload_video_lesson(
     }
 
     lessons_collection.insert_one(lesson)
+    record_lesson_created(lesson)
 
     return {"message": "Video uploaded successfully", "lesson": lesson}
@@ -6,6 +6,7 @@ import os
 import shutil
 import json
 from db import lessons_collection
+from routes.analytics import record_lesson_created
 
 router = APIRouter()
 
@@ -61,6 +62,7 @@ async def upload_quiz_lesson(
     }
 
     lessons_collection.insert_one(lesson)
+    record_lesson_created(lesson)
 
     return {"message": "Quiz uploaded and saved to MongoDB", "lesson": lesson}
 
@@ -6,6 +6,7 @@ import os
 import shutil
 from bson.binary import Binary
 from db import lessons_collection
+from routes.analytics import record_lesson_created
 
 router = APIRouter()
 
@@ -93,6 +94,7 @@ async def upload_text_lesson(
     }
 
     lessons_collection.insert_one(lesson)
+    record_lesson_created(lesson)
 
     return {"message": "Text lesson uploaded successfully", "lesson": lesson}
 
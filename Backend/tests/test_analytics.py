@@ -0,0 +1,163 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from routes.analytics import (
+    DAILY_WINDOW_DAYS,
+    MAX_DAILY_WINDOW_DAYS,
+    MAX_EVENTS_PER_BATCH,
+    EventBatch,
+    LessonEvent,
+    collapse_events,
+    daily_window,
+    format_rollup,
+    lesson_update,
+    rebuild_pipeline,
+    rollup_id,
+    rollup_id_expr,
+    utc_day,
+)
+
+DAY = "2026-10-19"
+LESSONS = {
+    "L1": {"_id": "L1", "tutor_id": "tutor123", "category": "Math"},
+    "L2": {"_id": "L2", "tutorId": "tutor123"},
+    "L3": {"_id": "L3", "tutor_id": "tutor234", "category": "Programming"},
+}
+
+def evaluate(expr, doc):
+    """Evaluate the small subset of aggregation expressions used for rollup _ids"""
+    if isinstance(expr, str):
+        return doc[expr[1:]] if expr.startswith("$") else expr
+    if "$literal" in expr:
+        return expr["$literal"]
+    if "$concat" in expr:
+        return "".join(evaluate(part, doc) for part in expr["$concat"])
+    raise ValueError(f"Unsupported expression: {expr}")
+
+def test_collapse_events_folds_batch_per_lesson_and_rollup():
+    events = [
+        LessonEvent(lesson_id="L1", type="view"),
+        LessonEvent(lesson_id="L1", type="view"),
+        LessonEvent(lesson_id="L1", type="completion"),
+        LessonEvent(lesson_id="L2", type="view"),
+    ]
+    lesson_increments, rollups = collapse_events(events, LESSONS, DAY)
+
+    assert lesson_increments == {"L1": {"views": 2, "completions": 1}, "L2": {"views": 1}}
+    assert rollups[rollup_id("tutor123", "tutor", "tutor123")]["inc"] == {"views": 3, "completions": 1}
+    assert rollups[rollup_id("tutor123", "lesson", "L1")]["inc"] == {"views": 2, "completions": 1}
+    assert rollups[rollup_id("tutor123", "category", "Math")]["inc"] == {"views": 2, "completions": 1}
+    assert rollups[rollup_id("tutor123", "category", "Uncategorized")]["inc"] == {"views": 1}
+    assert rollups[rollup_id("tutor123", "daily", DAY)]["inc"] == {"views": 3, "completions": 1}
+
+    lesson_daily = rollups[rollup_id("tutor123", "lesson_daily", f"{DAY}:L1")]
+    assert lesson_daily["day"] == DAY
+    assert lesson_daily["lesson_id"] == "L1"
+    assert rollups[rollup_id("tutor123", "category_daily", f"{DAY}:Math")]["category"] == "Math"
+    # tutor, 2 lessons, 2 categories, daily, 2 lesson_daily, 2 category_daily
+    assert len(rollups) == 10
+
+def test_collapse_events_keeps_tutors_apart():
+    events = [LessonEvent(lesson_id="L1", type="view"), LessonEvent(lesson_id="L3", type="view")]
+    _, rollups = collapse_events(events, LESSONS, DAY)
+
+    assert {rollup["tutor_id"] for rollup in rollups.values()} == {"tutor123", "tutor234"}
+    assert rollups[rollup_id("tutor234", "daily", DAY)]["inc"] == {"views": 1}
+
+def test_collapse_events_rejects_unknown_lesson():
+    with pytest.raises(HTTPException) as error:
+        collapse_events([LessonEvent(lesson_id="missing", type="view")], LESSONS, DAY)
+    assert error.value.status_code == 404
+
+def test_collapse_events_rejects_lesson_without_tutor():
+    with pytest.raises(HTTPException) as error:
+        collapse_events([LessonEvent(lesson_id="L9", type="view")], {"L9": {"_id": "L9"}}, DAY)
+    assert error.value.status_code == 400
+
+def test_event_validation():
+    with pytest.raises(ValidationError):
+        LessonEvent(lesson_id="L1", type="rating")
+    with pytest.raises(ValidationError):
+        EventBatch(events=[])
+    with pytest.raises(ValidationError):
+        EventBatch(events=[{"lesson_id": "L1", "type": "view"}] * (MAX_EVENTS_PER_BATCH + 1))
+
+def test_utc_day_normalises_aware_times():
+    assert utc_day(datetime(2026, 10, 19, 23, 30, tzinfo=timezone(timedelta(hours=-5)))) == "2026-10-20"
+
+def test_lesson_update_increments_counters():
+    assert lesson_update({"views": 2, "completions": 1}) == {"$inc": {"views": 2, "completions": 1}}
+
+def test_format_rollup_derives_rates():
+    doc = {
+        "key": "tutor123",
+        "views": 4,
+        "completions": 1,
+        "rating_sum": 6.5,
+        "rating_count": 2,
+        "lesson_count": 3,
+        "updated_at": "2026-10-19T10:00:00",
+    }
+    assert format_rollup(doc) == {
+        "key": "tutor123",
+        "views": 4,
+        "completions": 1,
+        "completion_rate": 0.25,
+        "rating_count": 2,
+        "average_rating": 3.25,
+        "updated_at": "2026-10-19T10:00:00",
+        "lesson_count": 3,
+    }
+
+def test_format_rollup_handles_empty_counters():
+    rollup = format_rollup({"key": f"{DAY}:L1", "day": DAY, "lesson_id": "L1"})
+    assert rollup["completion_rate"] == 0
+    assert rollup["average_rating"] == 0
+    assert rollup["day"] == DAY
+    assert rollup["lesson_id"] == "L1"
+    assert "lesson_count" not in rollup
+
+@pytest.mark.parametrize("scope,key", [
+    ("tutor", "tutor123"),
+    ("lesson", "64f0c2a1e4b0a1b2c3d4e5f6"),
+    ("category", "Soft Skills"),
+])
+def test_rollup_id_matches_rebuild_pipeline(scope, key):
+    assert evaluate(rollup_id_expr("tutor123"), {"scope": scope, "key": key}) == rollup_id("tutor123", scope, key)
+
+def test_rebuild_pipeline_uses_rollup_id_expr():
+    pipeline = rebuild_pipeline("tutor123", 7, "2026-10-19T10:00:00")
+    set_stage = next(stage["$set"] for stage in pipeline if "$set" in stage and "_id" in stage["$set"])
+
+    assert set_stage["_id"] == rollup_id_expr("tutor123")
+    assert set_stage["version"] == 7
+    assert pipeline[-1]["$merge"]["into"] == "analytics"
+
+def test_rebuild_pipeline_always_emits_tutor_rollup():
+    pipeline = rebuild_pipeline("tutor123", 1, "2026-10-19T10:00:00")
+    rollups = next(stage["$project"]["rollups"] for stage in pipeline if "rollups" in stage.get("$project", {}))
+    empty_tutor = rollups["$concatArrays"][-1]["$cond"][1][0]["$literal"]
+
+    assert empty_tutor["scope"] == "tutor"
+    assert empty_tutor["key"] == "tutor123"
+    assert evaluate(rollup_id_expr("tutor123"), empty_tutor) == rollup_id("tutor123", "tutor", "tutor123")
+
+def test_daily_window_defaults_to_last_days():
+    today = date(2026, 10, 19)
+    assert daily_window(today=today) == (today - timedelta(days=DAILY_WINDOW_DAYS - 1), today)
+    assert daily_window(to_day=date(2026, 1, 31)) == (date(2026, 1, 2), date(2026, 1, 31))
+
+def test_daily_window_rejects_bad_ranges():
+    with pytest.raises(HTTPException) as error:
+        daily_window(date(2026, 10, 20), date(2026, 10, 19))
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        daily_window(date(2026, 1, 1), date(2026, 1, 1) + timedelta(days=MAX_DAILY_WINDOW_DAYS))
+    assert error.value.status_code == 400
+
+    longest = date(2026, 1, 1) + timedelta(days=MAX_DAILY_WINDOW_DAYS - 1)
+    assert daily_window(date(2026, 1, 1), longest) == (date(2026, 1, 1), longest)
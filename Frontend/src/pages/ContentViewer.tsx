@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { useGame } from '../contexts/GameContext';
@@ -42,12 +42,35 @@ function ContentViewer() {
   const [showResults, setShowResults] = useState(false);
   const [score, setScore] = useState(0);
 
+  // Lessons already reported to analytics, so re-renders don't double count
+  const reportedViews = useRef(new Set<string>());
+  const reportedCompletions = useRef(new Set<string>());
+
   useEffect(() => {
     if (contentId) {
       fetchContent();
     }
   }, [contentId]);
 
+  const recordEvent = async (lessonId: string, type: 'view' | 'completion') => {
+    const reported = type === 'view' ? reportedViews.current : reportedCompletions.current;
+    if (reported.has(lessonId)) return;
+    reported.add(lessonId);
+
+    try {
+      await fetch('http://localhost:8000/api/analytics/events', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Authorization: `Bearer ${token}`,
+        },
+        body: JSON.stringify({ events: [{ lesson_id: lessonId, type }] }),
+      });
+    } catch (err) {
+      console.error('Error recording analytics event:', err);
+    }
+  };
+
   const fetchContent = async () => {
     try {
       const response = await fetch(`http://localhost:8000/api/lessons/${contentId}`, {
@@ -59,6 +82,7 @@ function ContentViewer() {
       if (response.ok) {
         const data = await response.json();
         setContent(data.lesson);
+        recordEvent(data.lesson._id, 'view');
       } else {
         setError('Content not found');
       }
@@ -98,6 +122,7 @@ function ContentViewer() {
     
     // Update progress
     updateProgress(content._id, content.format);
+    recordEvent(content._id, 'completion');
   };
 
   const resetQuiz = () => {
@@ -110,6 +135,7 @@ function ContentViewer() {
   const handleContentComplete = () => {
     if (content) {
       updateProgress(content._id, content.format);
+      recordEvent(content._id, 'completion');
     }
   };
 
@@ -20,12 +20,23 @@ interface Lesson {
   thumbnail?: string;
 }
 
+interface AnalyticsRollup {
+  key: string;
+  views: number;
+  completions: number;
+  completion_rate: number;
+  rating_count: number;
+  average_rating: number;
+  lesson_count?: number;
+}
+
 function TutorDashboard() {
   const { user, token } = useAuth();
   const [lessons, setLessons] = useState<Lesson[]>([]);
   const [isUploadModalOpen, setIsUploadModalOpen] = useState(false);
   const [activeTab, setActiveTab] = useState<'overview' | 'content' | 'analytics'>('overview');
   const [isLoading, setIsLoading] = useState(true);
+  const [categories, setCategories] = useState<AnalyticsRollup[]>([]);
   const [stats, setStats] = useState({
     totalLessons: 0,
     totalViews: 0,
@@ -36,6 +47,7 @@ function TutorDashboard() {
   useEffect(() => {
     if (user) {
       fetchLessons();
+      fetchAnalytics();
     }
   }, [user]);
 
@@ -50,7 +62,7 @@ function TutorDashboard() {
       if (response.ok) {
         const data = await response.json();
         setLessons(data.lessons || []);
-        calculateStats(data.lessons || []);
+        setStats((prev) => ({ ...prev, totalLessons: (data.lessons || []).length }));
       }
     } catch (error) {
       console.error('Error fetching lessons:', error);
@@ -59,24 +71,32 @@ function TutorDashboard() {
     }
   };
 
-  const calculateStats = (lessonsData: Lesson[]) => {
-    const totalLessons = lessonsData.length;
-    const totalViews = lessonsData.reduce((sum, lesson) => sum + (lesson.views || 0), 0);
-    const totalCompletions = lessonsData.reduce((sum, lesson) => sum + (lesson.completions || 0), 0);
-    const averageRating = lessonsData.length > 0 
-      ? lessonsData.reduce((sum, lesson) => sum + (lesson.rating || 0), 0) / lessonsData.length 
-      : 0;
+  const fetchAnalytics = async () => {
+    try {
+      const response = await fetch(`http://localhost:8000/api/analytics/tutor/${user?.username}`, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      });
 
-    setStats({
-      totalLessons,
-      totalViews,
-      totalCompletions,
-      averageRating: Math.round(averageRating * 10) / 10,
-    });
+      if (response.ok) {
+        const data = await response.json();
+        setStats((prev) => ({
+          ...prev,
+          totalViews: data.totals.views,
+          totalCompletions: data.totals.completions,
+          averageRating: Math.round(data.totals.average_rating * 10) / 10,
+        }));
+        setCategories(data.categories || []);
+      }
+    } catch (error) {
+      console.error('Error fetching analytics:', error);
+    }
   };
 
   const handleUploadSuccess = () => {
     fetchLessons();
+    fetchAnalytics();
     setIsUploadModalOpen(false);
   };
 
@@ -388,19 +408,15 @@ function TutorDashboard() {
             <div className="bg-white p-6 rounded-xl shadow-sm border border-gray-200">
               <h3 className="text-lg font-semibold text-gray-900 mb-4">Content Categories</h3>
               <div className="space-y-3">
-                {Array.from(new Set(lessons.map(l => l.category))).map((category) => {
-                  const categoryLessons = lessons.filter(l => l.category === category);
-                  const totalViews = categoryLessons.reduce((sum, l) => sum + l.views, 0);
-                  return (
-                    <div key={category} className="flex items-center justify-between">
-                      <span className="text-gray-900">{category}</span>
-                      <div className="text-right">
-                        <div className="text-sm font-medium text-gray-900">{categoryLessons.length} lessons</div>
-                        <div className="text-xs text-gray-600">{totalViews} views</div>
-                      </div>
+                {categories.map((category) => (
+                  <div key={category.key} className="flex items-center justify-between">
+                    <span className="text-gray-900">{category.key}</span>
+                    <div className="text-right">
+                      <div className="text-sm font-medium text-gray-900">{category.lesson_count ?? 0} lessons</div>
+                      <div className="text-xs text-gray-600">{category.views} views</div>
                     </div>
-                  );
-                })}
+                  </div>
+                ))}
               </div>
             </div>
           </div>